@@ -1,25 +1,111 @@
 import requests
-import json
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import orjson
 import pandas as pd
 from datetime import datetime, timedelta
-import pytz
+from zoneinfo import ZoneInfo
 import os
 import numpy as np
 
+try:
+    from numba import njit
+except ImportError:  # numba is optional; fall back to the pure-Python loop
+    njit = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is optional; fall back to the .npz sidecar
+    pa = None
+
+# Candle storage is columnar (structure-of-arrays): one array per field,
+# all the same length, in chronological order
+CANDLE_COLUMNS = ('timestamp', 'date', 'period', 'open', 'high', 'low', 'close', 'volume')
+
+# Codes for the 'period' byte column
+PERIOD_MORNING = 0
+PERIOD_AFTERNOON = 1
+
+def _empty_candle_columns():
+    return {
+        'timestamp': np.array([], dtype='U22'),
+        'date': np.array([], dtype='U10'),
+        'period': np.array([], dtype=np.uint8),
+        'open': np.array([], dtype=np.float64),
+        'high': np.array([], dtype=np.float64),
+        'low': np.array([], dtype=np.float64),
+        'close': np.array([], dtype=np.float64),
+        'volume': np.array([], dtype=np.int64)
+    }
+
+def _candle_columns_from_records(records):
+    """Convert a legacy list of candle dicts to columnar arrays"""
+    columns = _empty_candle_columns()
+    if records:
+        for col in CANDLE_COLUMNS:
+            if col == 'period':
+                columns[col] = np.array(
+                    [PERIOD_AFTERNOON if r['period'] == 'afternoon' else PERIOD_MORNING for r in records],
+                    dtype=np.uint8
+                )
+            else:
+                columns[col] = np.array([r[col] for r in records], dtype=columns[col].dtype)
+    return columns
+
+def _wilders_recurrence(tr, atr, period):
+    # ATR = ((period-1) * previous_ATR + current_TR) / period
+    # The recurrence is inherently sequential, so run it as one tight
+    # scalar loop over the preallocated array (JIT-compiled when numba
+    # is available)
+    for i in range(1, len(atr)):
+        atr[i] = (atr[i-1] * (period - 1) + tr[period - 1 + i]) / period
+    return atr
+
+if njit is not None:
+    _wilders_recurrence = njit(cache=True)(_wilders_recurrence)
+
 class SPYLevelsCalculator:
     def __init__(self, api_key, data_file='spy_levels_data.json'):
         self.api_key = api_key
         self.data_file = data_file
-        self.et_tz = pytz.timezone('US/Eastern')
-        
-        # Fibonacci ratios for levels
-        self.fib_ratios = [1.0, 0.786, 0.618, 0.5, 0.382, 0.236, 0.0]
-        
-    def fetch_intraday_data(self):
-        """Fetch intraday SPY data from Polygon.io (SPY tracks SPX closely)"""
-        # Get date range for last 15 days (need more to ensure 14+ four-hour periods)
+        # Candle columns live in a sidecar next to the JSON: Parquet when
+        # pyarrow is available, compressed .npz otherwise
+        self.parquet_file = os.path.splitext(data_file)[0] + '.parquet'
+        self.array_file = os.path.splitext(data_file)[0] + '.npz'
+        # zoneinfo localizes in C, unlike pytz's Python-level conversions
+        self.et_tz = ZoneInfo('US/Eastern')
+
+        # Persistent session: reuses the TLS connection across Polygon
+        # calls and retries transient failures with backoff
+        self.session = requests.Session()
+        self.session.headers.update({
+            'Accept-Encoding': 'gzip',
+            'Authorization': f'Bearer {api_key}'
+        })
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=4,
+            max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+        )
+        self.session.mount('https://', adapter)
+        
+        # Fibonacci ratios for levels, with the nonzero ratios and their
+        # level labels precomputed once for calculate_levels
+        self.fib_ratios = np.asarray([1.0, 0.786, 0.618, 0.5, 0.382, 0.236, 0.0], dtype=np.float64)
+        self._level_ratios = self.fib_ratios[self.fib_ratios != 0.0]
+        self._pos_labels = [f"Level_+{ratio}" for ratio in self._level_ratios]
+        self._neg_labels = [f"Level_-{ratio}" for ratio in self._level_ratios]
+        
+    def fetch_intraday_data(self, start_date=None):
+        """Fetch intraday SPY data from Polygon.io (SPY tracks SPX closely)
+
+        start_date limits the request window; when None, fall back to the
+        last 15 days (enough to bootstrap 14+ four-hour periods).
+        """
         end_date = datetime.now(self.et_tz).date()
-        start_date = end_date - timedelta(days=15)
+        if start_date is None:
+            start_date = end_date - timedelta(days=15)
         
         # Format dates for Polygon API (YYYY-MM-DD)
         start_str = start_date.strftime('%Y-%m-%d')
@@ -27,16 +113,18 @@ class SPYLevelsCalculator:
         
         # Polygon.io aggregates endpoint for SPY ETF (tracks SPX)
         url = f"https://api.polygon.io/v2/aggs/ticker/SPY/range/5/minute/{start_str}/{end_str}"
+        # Size the limit to the window (78 five-minute bars per session,
+        # doubled for slack) instead of a blanket 50000
+        trading_days = int(np.busday_count(start_date, end_date)) + 1
         params = {
-            'apikey': self.api_key,
             'adjusted': 'true',
             'sort': 'asc',
-            'limit': 50000
+            'limit': max(trading_days * 78 * 2, 5000)
         }
-        
+
         try:
-            response = requests.get(url, params=params)
-            data = response.json()
+            response = self.session.get(url, params=params)
+            data = orjson.loads(response.content)
             
             # Print raw response for debugging
             print(f"API Response Status Code: {response.status_code}")
@@ -48,191 +136,196 @@ class SPYLevelsCalculator:
                 error_msg = data.get('error', data.get('message', f"Unexpected status: {data.get('status')}"))
                 raise Exception(f"API Error: {error_msg}")
             
-            # Convert Polygon format to our expected format
-            polygon_data = {}
-            if 'results' in data and data['results']:
-                for bar in data['results']:
-                    # Convert timestamp from milliseconds to datetime
-                    dt = datetime.fromtimestamp(bar['t'] / 1000, tz=self.et_tz)
-                    timestamp_str = dt.strftime('%Y-%m-%d %H:%M:%S')
-                    
-                    polygon_data[timestamp_str] = {
-                        'open': float(bar['o']),
-                        'high': float(bar['h']),
-                        'low': float(bar['l']),
-                        'close': float(bar['c']),
-                        'volume': int(bar['v'])
-                    }
-                
-                print(f"Successfully fetched {len(polygon_data)} data points")
+            results = data.get('results') or []
+
+            # Follow pagination if Polygon still splits the response; the
+            # session's Authorization header covers the next_url calls
+            while data.get('next_url'):
+                response = self.session.get(data['next_url'])
+                data = orjson.loads(response.content)
+                results.extend(data.get('results') or [])
+
+            # Materialize each bar field as one contiguous ndarray with
+            # np.fromiter, going straight from epoch-ms to localized
+            # timestamps — no per-bar dict or cell-by-cell DataFrame build
+            if results:
+                n = len(results)
+                df = pd.DataFrame({
+                    'timestamp': pd.to_datetime(
+                        np.fromiter((bar['t'] for bar in results), dtype=np.int64, count=n),
+                        unit='ms', utc=True
+                    ).tz_convert(self.et_tz),
+                    'open': np.fromiter((bar['o'] for bar in results), dtype=np.float64, count=n),
+                    'high': np.fromiter((bar['h'] for bar in results), dtype=np.float64, count=n),
+                    'low': np.fromiter((bar['l'] for bar in results), dtype=np.float64, count=n),
+                    'close': np.fromiter((bar['c'] for bar in results), dtype=np.float64, count=n),
+                    'volume': np.fromiter((bar['v'] for bar in results), dtype=np.int64, count=n)
+                })
+                print(f"Successfully fetched {len(df)} data points")
             else:
+                df = pd.DataFrame()
                 print("No results in API response")
-            
-            return polygon_data
-        
+
+            return df
+
         except Exception as e:
             print(f"Error fetching data: {e}")
-            return {}
+            return pd.DataFrame()
     
     def load_existing_data(self):
-        """Load existing data from JSON file"""
+        """Load stored candle/ATR columns (npz) and current levels (JSON)
+
+        Falls back to migrating the legacy all-JSON layout, where candles
+        and ATR values were stored as lists of dicts.
+        """
+        data = {'candles': _empty_candle_columns(), 'current_levels': {}}
+
+        stored = {}
         if os.path.exists(self.data_file):
-            with open(self.data_file, 'r') as f:
-                return json.load(f)
-        return {"4h_candles": [], "atr_values": [], "current_levels": {}}
-    
+            with open(self.data_file, 'rb') as f:
+                stored = orjson.loads(f.read())
+            data['current_levels'] = stored.get('current_levels', {})
+
+        empty = _empty_candle_columns()
+        if pa is not None and os.path.exists(self.parquet_file):
+            table = pq.read_table(self.parquet_file)
+            data['candles'] = {
+                col: table[col].to_numpy().astype(empty[col].dtype)
+                for col in CANDLE_COLUMNS
+            }
+        elif os.path.exists(self.array_file):
+            with np.load(self.array_file) as npz:
+                data['candles'] = {col: npz[f'candle_{col}'] for col in CANDLE_COLUMNS}
+        elif stored.get('4h_candles'):
+            # Legacy JSON layout: lift the candle records into columns
+            data['candles'] = _candle_columns_from_records(stored['4h_candles'])
+
+        return data
+
     def save_data(self, data):
-        """Save data to JSON file"""
-        with open(self.data_file, 'w') as f:
-            json.dump(data, f, indent=2)
+        """Save candle columns to the binary sidecar and levels to JSON"""
+        if pa is not None:
+            table = pa.table({col: data['candles'][col] for col in CANDLE_COLUMNS})
+            pq.write_table(table, self.parquet_file, compression='zstd')
+        else:
+            np.savez_compressed(
+                self.array_file,
+                **{f'candle_{col}': arr for col, arr in data['candles'].items()}
+            )
+        with open(self.data_file, 'wb') as f:
+            f.write(orjson.dumps({'current_levels': data['current_levels']}, option=orjson.OPT_INDENT_2))
     
-    def convert_to_4h_candles(self, intraday_data):
-        """Convert 5-minute data to 4-hour candles (9:00-13:00 and 13:00-close)"""
-        if not intraday_data:
-            return []
-            
-        # Convert to DataFrame for easier manipulation
-        df_data = []
-        for timestamp_str, values in intraday_data.items():
-            dt = datetime.strptime(timestamp_str, '%Y-%m-%d %H:%M:%S')
-            dt = self.et_tz.localize(dt) if dt.tzinfo is None else dt
-            
-            df_data.append({
-                'timestamp': dt,
-                'open': values['open'],
-                'high': values['high'],
-                'low': values['low'],
-                'close': values['close'],
-                'volume': values['volume']
-            })
-        
-        df = pd.DataFrame(df_data)
-        df = df.sort_values('timestamp')
-        
+    def convert_to_4h_candles(self, intraday_df):
+        """Convert a DataFrame of 5-minute bars to 4-hour candles (9:00-13:00 and 13:00-close)
+
+        Returns one array per CANDLE_COLUMNS field, in chronological order.
+        """
+        if intraday_df.empty:
+            return _empty_candle_columns()
+
+        # Polygon returns bars sort=asc, so this is normally a single O(N)
+        # monotonicity check with no sort
+        df = intraday_df
+        if not df['timestamp'].is_monotonic_increasing:
+            df = df.sort_values('timestamp')
+
         # Filter for regular market hours only (9:30 AM - 4:00 PM ET)
         # This excludes pre-market and after-hours data
-        df = df[
-            ((df['timestamp'].dt.hour == 9) & (df['timestamp'].dt.minute >= 30)) |
-            ((df['timestamp'].dt.hour >= 10) & (df['timestamp'].dt.hour < 16))
-        ]
-        
-        # Create 4-hour blocks
-        four_hour_candles = []
-        
-        # Group by date first
-        for date, day_data in df.groupby(df['timestamp'].dt.date):
-            day_data = day_data.sort_values('timestamp')
-            
-            # Morning block: 9:30 AM - 1:00 PM ET (9:30-13:00)
-            morning = day_data[
-                ((day_data['timestamp'].dt.hour == 9) & (day_data['timestamp'].dt.minute >= 30)) |
-                ((day_data['timestamp'].dt.hour >= 10) & (day_data['timestamp'].dt.hour < 13))
-            ]
-            
-            # Afternoon block: 1:00 PM - 4:00 PM ET (13:00-16:00)
-            afternoon = day_data[
-                (day_data['timestamp'].dt.hour >= 13) & (day_data['timestamp'].dt.hour < 16)
-            ]
-            
-            # Create candles for each block
-            blocks = [
-                ('morning', morning, f"{date} 09:30-13:00"),
-                ('afternoon', afternoon, f"{date} 13:00-16:00")
-            ]
-            
-            for block_name, block_data, timestamp_label in blocks:
-                if len(block_data) > 0:
-                    candle = {
-                        'timestamp': timestamp_label,
-                        'date': str(date),
-                        'period': block_name,
-                        'open': float(block_data.iloc[0]['open']),
-                        'high': float(block_data['high'].max()),
-                        'low': float(block_data['low'].min()),
-                        'close': float(block_data.iloc[-1]['close']),
-                        'volume': int(block_data['volume'].sum())
-                    }
-                    four_hour_candles.append(candle)
-        
-        return four_hour_candles
+        hour = df['timestamp'].dt.hour
+        minute = df['timestamp'].dt.minute
+        df = df[((hour == 9) & (minute >= 30)) | ((hour >= 10) & (hour < 16))]
+
+        # Bucket every bar by its 4-hour block start (9:30 AM for morning,
+        # 1:00 PM for afternoon) and aggregate with a single-key groupby in
+        # one compiled pass. The block edge is computed on naive wall-clock
+        # time: a fixed resample('4h') grid would drift an hour across DST
+        # changes and split the session at 10:00/14:00.
+        wall = df['timestamp'].dt.tz_localize(None)
+        block_start = wall.dt.normalize() + pd.to_timedelta(
+            np.where(wall.dt.hour < 13, 9.5, 13.0), unit='h'
+        )
+
+        blocks = df.groupby(block_start.rename('block_start'), sort=True).agg(
+            open=('open', 'first'),
+            high=('high', 'max'),
+            low=('low', 'min'),
+            close=('close', 'last'),
+            volume=('volume', 'sum')
+        ).reset_index()
+
+        # Materialize all candle columns in one batch straight from the
+        # aggregation result instead of appending per-candle records
+        block_start = blocks['block_start']
+        period = np.where(
+            block_start.dt.hour == 9, PERIOD_MORNING, PERIOD_AFTERNOON
+        ).astype(np.uint8)
+        date = block_start.dt.strftime('%Y-%m-%d').to_numpy(dtype='U10')
+        timestamp = np.char.add(
+            date, np.where(period == PERIOD_MORNING, ' 09:30-13:00', ' 13:00-16:00')
+        )
+
+        return {
+            'timestamp': timestamp,
+            'date': date,
+            'period': period,
+            'open': blocks['open'].to_numpy(dtype=np.float64),
+            'high': blocks['high'].to_numpy(dtype=np.float64),
+            'low': blocks['low'].to_numpy(dtype=np.float64),
+            'close': blocks['close'].to_numpy(dtype=np.float64),
+            'volume': blocks['volume'].to_numpy(dtype=np.int64)
+        }
     
     def calculate_true_range(self, candles):
-        """Calculate True Range for each 4H candle"""
-        if len(candles) < 2:
-            return []
-            
-        tr_values = []
-        
-        for i in range(1, len(candles)):
-            current = candles[i]
-            previous = candles[i-1]
-            
-            # True Range = max of:
-            # 1. High - Low
-            # 2. |High - Previous Close|
-            # 3. |Low - Previous Close|
-            tr1 = current['high'] - current['low']
-            tr2 = abs(current['high'] - previous['close'])
-            tr3 = abs(current['low'] - previous['close'])
-            
-            true_range = max(tr1, tr2, tr3)
-            tr_values.append({
-                'timestamp': current['timestamp'],
-                'date': current['date'],
-                'period': current['period'],
-                'true_range': float(true_range),
-                'close': float(current['close'])
-            })
-        
-        return tr_values
+        """Calculate True Range for each 4H candle.
+
+        Takes candle columns and returns a True Range ndarray (entry i
+        describes candle i+1).
+        """
+        high = candles['high']
+        low = candles['low']
+        close = candles['close']
+        if len(close) < 2:
+            return np.array([])
+
+        # True Range = max of:
+        # 1. High - Low
+        # 2. |High - Previous Close|
+        # 3. |Low - Previous Close|
+        prev_close = close[:-1]
+        return np.maximum(
+            high[1:] - low[1:],
+            np.maximum(np.abs(high[1:] - prev_close), np.abs(low[1:] - prev_close))
+        )
     
-    def calculate_wilders_atr(self, tr_values, period=14):
-        """Calculate ATR using Wilder's smoothing method"""
-        if len(tr_values) < period:
-            return []
-            
-        atr_values = []
-        
-        # First ATR is simple average of first 14 periods
-        first_atr = sum(tr['true_range'] for tr in tr_values[:period]) / period
-        atr_values.append({
-            'timestamp': tr_values[period-1]['timestamp'],
-            'date': tr_values[period-1]['date'],
-            'period': tr_values[period-1]['period'],
-            'atr': first_atr,
-            'close': tr_values[period-1]['close']
-        })
-        
+    def calculate_wilders_atr(self, tr, period=14):
+        """Calculate ATR using Wilder's smoothing method.
+
+        Returns an ATR ndarray (entry i describes candle period+i).
+        """
+        if len(tr) < period:
+            return np.array([])
+
+        atr = np.empty(len(tr) - period + 1)
+
+        # First ATR is simple average of the first `period` True Ranges
+        atr[0] = tr[:period].mean()
+
         # Subsequent ATRs use Wilder's smoothing
-        # ATR = ((period-1) * previous_ATR + current_TR) / period
-        for i in range(period, len(tr_values)):
-            prev_atr = atr_values[-1]['atr']
-            current_tr = tr_values[i]['true_range']
-            
-            new_atr = ((period - 1) * prev_atr + current_tr) / period
-            
-            atr_values.append({
-                'timestamp': tr_values[i]['timestamp'],
-                'date': tr_values[i]['date'],
-                'period': tr_values[i]['period'],
-                'atr': float(new_atr),
-                'close': float(tr_values[i]['close'])
-            })
-        
-        return atr_values
+        _wilders_recurrence(np.ascontiguousarray(tr, dtype=np.float64), atr, period)
+
+        return atr
     
     def calculate_levels(self, prior_4h_close, current_atr):
         """Calculate Fibonacci-based levels using prior 4H close and current ATR"""
-        levels = {}
-        
-        for ratio in self.fib_ratios:
-            # Positive levels (above prior close)
-            if ratio == 0.0:
-                levels[f"Level_0"] = prior_4h_close
-            else:
-                levels[f"Level_+{ratio}"] = prior_4h_close + (current_atr * ratio)
-                levels[f"Level_-{ratio}"] = prior_4h_close - (current_atr * ratio)
-        
+        # One broadcast for all levels above and below the prior close
+        offsets = current_atr * self._level_ratios
+        upper = prior_4h_close + offsets
+        lower = prior_4h_close - offsets
+
+        levels = {label: float(value) for label, value in zip(self._pos_labels, upper)}
+        levels.update({label: float(value) for label, value in zip(self._neg_labels, lower)})
+        levels["Level_0"] = prior_4h_close
+
         return levels
     
     def get_update_type(self):
@@ -255,63 +348,85 @@ class SPYLevelsCalculator:
         update_type, target_period = self.get_update_type()
         print(f"Update type: {update_type}, Target period: {target_period}")
         
+        # Load existing data
+        stored_data = self.load_existing_data()
+
+        # Only fetch what the stored candles don't already cover: completed
+        # sessions are cached in the data file, so start one day before the
+        # last stored candle instead of re-downloading 15 full days
+        start_date = None
+        stored_candles = stored_data['candles']
+        if len(stored_candles['date']) > 0:
+            last_date = datetime.strptime(str(stored_candles['date'][-1]), '%Y-%m-%d').date()
+            start_date = last_date - timedelta(days=1)
+            print(f"Incremental fetch from {start_date} (last stored candle: {last_date})")
+        else:
+            print("No stored candles found, fetching the full 15-day window")
+
         # Fetch new intraday data
-        intraday_data = self.fetch_intraday_data()
-        if not intraday_data:
+        intraday_df = self.fetch_intraday_data(start_date=start_date)
+        if intraday_df.empty:
             print("No new data fetched")
             return
         
-        # Load existing data
-        stored_data = self.load_existing_data()
-        
-        # Convert to 4-hour candles
-        new_4h_candles = self.convert_to_4h_candles(intraday_data)
-        
-        # Merge with existing candles (remove duplicates)
-        existing_timestamps = {candle['timestamp'] for candle in stored_data['4h_candles']}
-        unique_new_candles = [c for c in new_4h_candles if c['timestamp'] not in existing_timestamps]
-        
-        all_candles = stored_data['4h_candles'] + unique_new_candles
-        
-        # Sort by timestamp and keep last 30 candles (enough for ATR calculation)
-        all_candles = sorted(all_candles, key=lambda x: x['timestamp'])[-30:]
-        
+        # Convert to 4-hour candle columns
+        new_candles = self.convert_to_4h_candles(intraday_df)
+
+        # Merge with existing candles (remove duplicates). Both timestamp
+        # columns are sorted, so searchsorted gives a vectorized membership
+        # test without rebuilding a Python set every update
+        existing_ts = stored_candles['timestamp']
+        new_ts = new_candles['timestamp']
+        if len(existing_ts) > 0:
+            pos = np.searchsorted(existing_ts, new_ts)
+            clipped = np.minimum(pos, len(existing_ts) - 1)
+            keep = (pos == len(existing_ts)) | (existing_ts[clipped] != new_ts)
+        else:
+            keep = np.ones(len(new_ts), dtype=bool)
+        all_candles = {
+            col: np.concatenate([stored_candles[col], new_candles[col][keep]])
+            for col in CANDLE_COLUMNS
+        }
+
+        # Keep the last 30 candles (enough for ATR calculation). No sort is
+        # needed: stored candles are chronological, Polygon returns bars
+        # sort=asc, and deduplication leaves only candles newer than the
+        # stored tail, so the concatenation is already in order
+        all_candles = {col: arr[-30:] for col, arr in all_candles.items()}
+
         # Calculate True Range
-        tr_values = self.calculate_true_range(all_candles)
-        
+        tr = self.calculate_true_range(all_candles)
+
         # Calculate ATR(14) using Wilder's method
-        atr_values = self.calculate_wilders_atr(tr_values, period=14)
-        
-        if not atr_values:
+        atr = self.calculate_wilders_atr(tr, period=14)
+
+        if len(atr) == 0:
             print("Not enough data for ATR calculation (need at least 14 periods)")
             return
-        
+
         # Get the most recent ATR value
-        current_atr_data = atr_values[-1]
-        current_atr = current_atr_data['atr']
+        current_atr = float(atr[-1])
         
         # Find the prior 4H close for level calculation
         # For 1PM update: use the most recent morning candle's close
         # For 4PM update: use the most recent afternoon candle's close
-        prior_4h_close = None
-        
-        # Look for the most recent candle of the target period
-        for candle in reversed(all_candles):
-            if candle['period'] == target_period:
-                prior_4h_close = candle['close']
-                print(f"Using {target_period} close: {prior_4h_close}")
-                break
-        
-        if prior_4h_close is None:
+        target_code = PERIOD_AFTERNOON if target_period == 'afternoon' else PERIOD_MORNING
+        target_indices = np.flatnonzero(all_candles['period'] == target_code)
+
+        if len(target_indices) == 0:
             print(f"Could not find recent {target_period} candle for level calculation")
             return
+
+        prior_4h_close = float(all_candles['close'][target_indices[-1]])
+        print(f"Using {target_period} close: {prior_4h_close}")
         
         # Calculate new levels
         new_levels = self.calculate_levels(prior_4h_close, current_atr)
         
-        # Update stored data
-        stored_data['4h_candles'] = all_candles
-        stored_data['atr_values'] = atr_values
+        # Update stored data. The full ATR history is not persisted: it is
+        # recomputed from the stored candles on every run and only the
+        # latest value (kept in current_levels) is used downstream
+        stored_data['candles'] = all_candles
         stored_data['current_levels'] = {
             'update_type': update_type,
             'timestamp': datetime.now(self.et_tz).isoformat(),
@@ -334,8 +449,8 @@ class SPYLevelsCalculator:
         for level_name, level_value in sorted_levels:
             print(f"{level_name}: {level_value:.2f}")
         
-        print(f"\nTotal 4H candles stored: {len(all_candles)}")
-        print(f"ATR calculation periods: {len(atr_values)}")
+        print(f"\nTotal 4H candles stored: {len(all_candles['close'])}")
+        print(f"ATR calculation periods: {len(atr)}")
 
 def main():
     # Get API key from environment variable